@@ -1,4 +1,4 @@
-from .flatten import flatten, flatten_with_pretty_keys
+from .flatten import flatten, flatten_iter, flatten_with_pretty_keys
 from .unflatten import unflatten
 from .merge import merge_by_update, merge_dicts
 from .split import split_dict_by_adapter
@@ -7,6 +7,7 @@ from .utils import apply_adapter
 
 __all__ = [
     "flatten",
+    "flatten_iter",
     "flatten_with_pretty_keys",
     "unflatten",
     "merge_by_update",
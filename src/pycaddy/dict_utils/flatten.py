@@ -1,21 +1,23 @@
-from typing import Any
+from typing import Any, Iterator
 from pydantic import TypeAdapter
 
 from .utils import apply_adapter
 
 
-def flatten(d: dict, parent_key=(), adapter: TypeAdapter = None) -> dict[tuple, Any]:
-    items = {}
+def flatten_iter(d: dict, parent_key=(), adapter: TypeAdapter = None) -> Iterator[tuple[tuple, Any]]:
+    """Yield ``(key_tuple, value)`` leaf pairs without building intermediate dicts."""
     for k, v in d.items():
         new_key = parent_key + (k,)  # Always treat keys as tuples
         v = apply_adapter(v, adapter)
         if isinstance(v, dict):
-            items.update(flatten(v, new_key, adapter=adapter))
+            yield from flatten_iter(v, new_key, adapter=adapter)
         else:
-            items[new_key] = v
-    return items
+            yield new_key, v
+
+
+def flatten(d: dict, parent_key=(), adapter: TypeAdapter = None) -> dict[tuple, Any]:
+    return dict(flatten_iter(d, parent_key, adapter=adapter))
 
 
 def flatten_with_pretty_keys(d: dict, sep: str = '__', adapter: TypeAdapter = None) -> dict[str, Any]:
-    flat = flatten(d, adapter=adapter)
-    return {sep.join(k): v for k, v in flat.items()}
\ No newline at end of file
+    return {sep.join(k): v for k, v in flatten_iter(d, adapter=adapter)}
@@ -1,28 +1,20 @@
-from .flatten import flatten
+from .flatten import flatten_iter
 import hashlib
 import json
 
-# def _hashable_flat_dict_set(d: dict):
-#     return frozenset(sorted(flatten(d).items()))
-#
-#
-# def hash_dict(d: dict):
-#     hashable_object = _hashable_flat_dict_set(d)
-#     return hash(hashable_object)
-
-
-
-def _hashable_flat_dict_set(d: dict):
-    # Create a sorted list of flattened key-value pairs
-    return sorted(flatten(d).items())
+# Compact, ASCII-only encoder reused across calls (json.dumps would build a
+# fresh one every time because of the non-default separators).
+_ENCODER = json.JSONEncoder(separators=(',', ':'), ensure_ascii=True)
 
 
 def hash_dict(d: dict) -> str:
-    hashable_object = _hashable_flat_dict_set(d)
-    # Convert to JSON string for consistent serialization
-    json_string = json.dumps(hashable_object, separators=(',', ':'), ensure_ascii=True)
-    # Use SHA256 for consistent hash
-    return hashlib.sha256(json_string.encode('utf-8')).hexdigest()
-
-
-
+    # SHA256 over the JSON list of sorted flattened (key, value) pairs,
+    # fed to the hasher item by item instead of as one big string.
+    # The digest is persisted in ledgers, so the byte stream must not change.
+    digest = hashlib.sha256(b'[')
+    for i, item in enumerate(sorted(flatten_iter(d))):
+        if i:
+            digest.update(b',')
+        digest.update(_ENCODER.encode(item).encode('ascii'))
+    digest.update(b']')
+    return digest.hexdigest()
@@ -16,37 +16,43 @@ What to keep in mind
 - Pass `relpath` as a *relative* `Path`; use `Path("")` for the project
   root.  The ledger does **no** path validation beyond converting it to
   a string key.
-- One `multiprocessing.Lock` (set by `set_global_lock`) serialises every
-  write; reads are lock-free.
+- A file lock on the sibling `metadata.lock` serialises every write,
+  across threads and processes alike; it is re-created in forked or
+  spawned workers, so no pool initializer is needed;
+  reads are lock-free and served from an in-memory copy until
+  the file changes.  Changes are detected by a write generation that
+  every write bumps in the sibling `metadata.gen`, together with the
+  file's (mtime, size) stamp - the stamp alone misses in-place patches
+  on filesystems with coarse mtimes.
 - UID counters are independent for each (identifier, relpath) pair.
+- Every record sits in a space-padded slot of the JSON file, so `log`
+  patches that slot in place instead of rewriting the whole ledger.
+  Those in-place patches are *not* atomic (a crash mid-write can tear
+  one record); full rewrites are, via an fsynced temp file and
+  `os.replace`.
 """
 
 from __future__ import annotations
 
-from contextlib import contextmanager, nullcontext
+import mmap
+import os
+import stat
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import Generator, TypeAlias
+from typing import Generator, Iterable, TypeAlias
+import orjson
 from filelock import FileLock
-from pydantic import TypeAdapter
 
-from .naming_strategy import counter_naming_strategy
+from .naming_strategy import next_free_counter, uid_formatting, uid_padding
 from .run_record import RunRecord
 from .singleton import PerPathSingleton
 from .status import Status
 
-# ---------------------------------------------------------------------
-#  Globals
-# ---------------------------------------------------------------------
-
-LEDGER_LOCK = None   # installed once in the pool initializer
-#
-#
-# def set_global_lock(lock: Lock | None) -> None:
-#     """Register the writer lock used by all processes."""
-#     global LEDGER_LOCK
-#     LEDGER_LOCK = lock
-
-
 # ---------------------------------------------------------------------
 #  Type aliases & helpers
 # ---------------------------------------------------------------------
@@ -55,7 +61,156 @@ UID_RECORD_DICT: TypeAlias = dict[str, RunRecord]          # uid   -> record
 RELPATH_DICT:     TypeAlias = dict[str, UID_RECORD_DICT]   # rel   -> records
 DATA_STRUCTURE:   TypeAlias = dict[str, RELPATH_DICT]      # ident -> paths
 
-DATA_ADAPTER = TypeAdapter(DATA_STRUCTURE)
+# Records are (de)serialised leaf by leaf; the nested dict shell around
+# them is plain JSON handled by orjson and never needs pydantic.
+RECORD_SERIALIZER = RunRecord.__pydantic_serializer__
+RECORD_VALIDATOR = RunRecord.__pydantic_validator__
+
+SLOT_KEY:  TypeAlias = tuple[str, str, str]                # (ident, rel, uid)
+SLOT:      TypeAlias = tuple[int, int]                     # (offset, width)
+FILE_STAMP: TypeAlias = tuple[int, int]                    # (mtime_ns, size)
+STAMP:     TypeAlias = tuple[int, int, int]                # (gen, mtime_ns, size)
+HASH_INDEX: TypeAlias = defaultdict[tuple[str, str], dict[str | None, str]]
+
+_SLOT_ALIGN = 256    # record slots are padded to a multiple of this
+_MMAP_THRESHOLD = 256 * 1024   # parse larger files straight from an mmap
+_PARALLEL_THRESHOLD = 200      # validate more leaves than this on a pool
+_WRITE_BUFFER = 64 * 1024      # buffer size for full rewrites
+_GEN_WIDTH = 20                # write generations are stored fixed-width
+_REPLACE_RETRIES = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5)  # seconds between tries
+
+
+def _stamp(path: Path | int) -> FILE_STAMP | None:
+    """Cheap change detector for the ledger file (None if missing)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_gen(path: Path) -> int | None:
+    """Current write generation (0 if never written, None if unreadable)."""
+    try:
+        with open(path, "rb") as fh:
+            raw = fh.read()
+    except FileNotFoundError:
+        return 0
+    try:
+        return int(raw)
+    except ValueError:            # caught mid-write: treat as "changed"
+        return None
+
+
+def _write_gen(path: Path, gen: int) -> None:
+    """Overwrite the write generation; fixed-width, so never truncated."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o666)
+    try:
+        os.write(fd, b"%*d" % (_GEN_WIDTH, gen))
+    finally:
+        os.close(fd)
+
+
+def _replace(src: Path, dst: Path) -> None:
+    """
+    `os.replace`, retried on PermissionError: Windows refuses to replace a
+    file that a reader has open or mapped.  Readers only hold the ledger
+    for a single parse, so a short back-off lets them finish first.
+    """
+    for delay in _REPLACE_RETRIES:
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            time.sleep(delay)
+    os.replace(src, dst)
+
+
+def _parse(fh, size: int) -> dict:
+    """
+    orjson-parse an open ledger file.  Large files are parsed from an mmap,
+    skipping the copy into a `bytes` object; small ones are just read.
+    """
+    if size < _MMAP_THRESHOLD:
+        return orjson.loads(fh.read())
+    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def _dump_key(key: str) -> bytes:
+    # JSON object keys must be strings; orjson would write e.g. 7 bare
+    return orjson.dumps(str(key))
+
+
+def _dump_record(record: RunRecord) -> bytes:
+    # None/default fields are restored by the validator on load
+    return RECORD_SERIALIZER.to_json(record, exclude_none=True, exclude_defaults=True)
+
+
+def _validate(raw: dict) -> DATA_STRUCTURE:
+    """Turn the parsed JSON shell into RunRecords, one leaf at a time."""
+    data: DATA_STRUCTURE = {}
+    targets: list[tuple[UID_RECORD_DICT, str]] = []
+    leaves: list[dict] = []
+    for ident, rel_dict in raw.items():
+        rels = data[ident] = {}
+        for rkey, uid_dict in rel_dict.items():
+            uids = rels[rkey] = {}
+            for uid, leaf in uid_dict.items():
+                targets.append((uids, uid))
+                leaves.append(leaf)
+
+    for (uids, uid), record in zip(targets, _validate_leaves(leaves)):
+        uids[uid] = record
+    return data
+
+
+def _validate_leaves(leaves: list[dict]) -> Iterable[RunRecord]:
+    """
+    Validate record leaves, on a thread pool for large ledgers.
+
+    pydantic-core keeps the GIL while validating Python objects, so the
+    pool only pays off on free-threaded interpreters; elsewhere it would
+    be slower than a plain loop.
+    """
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    if gil_enabled or len(leaves) <= _PARALLEL_THRESHOLD:
+        return map(RECORD_VALIDATOR.validate_python, leaves)
+    with ThreadPoolExecutor() as pool:
+        return list(pool.map(RECORD_VALIDATOR.validate_python, leaves))
+
+
+def _own_uid_dict(data: DATA_STRUCTURE, identifier: str, relkey: str) -> UID_RECORD_DICT:
+    """
+    Give a copy-on-write draft of the ledger its own copy of one uid-dict
+    (and of the rel-dict above it), leaving the cached original untouched.
+    """
+    rel_dict = data[identifier] = dict(data.get(identifier, {}))
+    uid_dict = rel_dict[relkey] = dict(rel_dict.get(relkey, {}))
+    return uid_dict
+
+
+def _copy_uid_dict(uid_dict: UID_RECORD_DICT) -> UID_RECORD_DICT:
+    """Detached copies of a uid-dict's records, for handing out to callers."""
+    return {uid: record.model_copy(deep=True) for uid, record in uid_dict.items()}
+
+
+def _hash_index(data: DATA_STRUCTURE) -> HASH_INDEX:
+    """Map (identifier, relkey) -> param_hash -> first uid carrying it."""
+    index: HASH_INDEX = defaultdict(dict)
+    for ident, rel_dict in data.items():
+        for rkey, uid_dict in rel_dict.items():
+            by_hash = index[(ident, rkey)]
+            for uid, record in uid_dict.items():
+                by_hash.setdefault(record.param_hash, uid)
+    return index
+
+
+def _reserve(raw: bytes) -> bytes:
+    """Pad a serialised record with spaces, leaving room to grow in place."""
+    width = (len(raw) // _SLOT_ALIGN + 1) * _SLOT_ALIGN
+    return raw.ljust(width)
 
 
 def _relkey(relpath: Path) -> str:
@@ -87,15 +242,23 @@ class Ledger(metaclass=PerPathSingleton):
             path: Path to the metadata.json file
             maxsize: Maximum number of runs per identifier/relpath combination
         """
-        self.file: Path = Path(path).expanduser().resolve()
+        # PerPathSingleton already hands us the resolved path
+        self.file: Path = Path(path)
         self.file.parent.mkdir(parents=True, exist_ok=True)
 
         self.maxsize = maxsize
         self._data: DATA_STRUCTURE = {}        # lazy cache
-
-        # NEW: always use a file-based lock
+        self._slots: dict[SLOT_KEY, SLOT] = {}  # record offsets on disk
+        self._data_stamp: STAMP | None = None   # file version behind _data
+        self._hash_index: HASH_INDEX = defaultdict(dict)
+        self._counters: dict[tuple[str, str], int] = {}  # next uid to try
+        self._stamp: STAMP | None = None        # file version after our write
+        self._gen_file = self.file.with_suffix(".gen")
+
+        # cross-process writer lock (flock/LockFileEx on a sibling file)
         self._file_lock_path = self.file.with_suffix(".lock")
         self._file_lock = FileLock(str(self._file_lock_path))
+        self._lock_pid = os.getpid()
 
     # -----------------------------------------------------------------
     #  Public API
@@ -117,16 +280,25 @@ class Ledger(metaclass=PerPathSingleton):
         uid : str      zero-padded counter ("000", "001", etc)
         """
         rkey = _relkey(relpath)
+        key = (identifier, rkey)
 
         with self._edit_uid_record_dict(identifier, rkey) as uid_dict:
-            uid = counter_naming_strategy(uid_dict.keys(), maxsize=self.maxsize)
+            # lowest free uid; the scan resumes where the previous allocation
+            # stopped (counters are dropped whenever the file is re-read)
+            i = next_free_counter(uid_dict, self._counters.get(key, 0),
+                                  maxsize=self.maxsize)
+            uid = uid_formatting(i, uid_padding(self.maxsize))
             record = RunRecord(
                 status=status,
                 param_hash=param_hash
             )
             record.timestamp_status()
             uid_dict[uid] = record
-            return uid
+
+        # the run is on disk now: advance the counter and index it
+        self._counters[key] = i + 1
+        self._hash_index[key].setdefault(param_hash, uid)
+        return uid
 
     # -----------------------------------------------------------------
     def log(
@@ -144,7 +316,7 @@ class Ledger(metaclass=PerPathSingleton):
         - status     : new lifecycle status (optional)
         - path_dict  : artefact name -> file path (optional)
         """
-        if not (status or path_dict):
+        if status is None and not path_dict:      # nothing to do: skip the lock
             return
 
         rkey = _relkey(relpath)
@@ -153,7 +325,36 @@ class Ledger(metaclass=PerPathSingleton):
                 rec.status = status
                 rec.timestamp_status()
             if path_dict:
-                rec.files.update(path_dict)
+                rec.files.update({k: Path(v) for k, v in path_dict.items()})
+
+    # -----------------------------------------------------------------
+    def log_bulk(
+        self,
+        identifier: str,
+        uid: str,
+        *,
+        relpath: Path = Path(""),
+        transitions: Iterable[tuple[datetime, Status]] = (),
+        files: dict[str, Path] | None = None,
+    ) -> None:
+        """
+        Apply several buffered updates to one run with a single write.
+
+        - transitions : (timestamp, status) pairs in the order they happened;
+                        the last one becomes the current status
+        - files       : artefact name -> file path
+        """
+        transitions = list(transitions)
+        if not transitions and not files:
+            return
+
+        rkey = _relkey(relpath)
+        with self._edit_record(identifier, rkey, uid) as rec:
+            for ts, status in transitions:
+                rec.status = status
+                rec.timestamp_status_lst.append((ts, status))
+            if files:
+                rec.files.update({k: Path(v) for k, v in files.items()})
 
     # -----------------------------------------------------------------
     def get_record(
@@ -163,11 +364,14 @@ class Ledger(metaclass=PerPathSingleton):
         *,
         relpath: Path = Path(""),
     ) -> RunRecord:
-        """Return a single RunRecord; raises KeyError if not found."""
+        """
+        Return a copy of a single RunRecord; raises KeyError if not found.
+        Mutating the copy never reaches the ledger - use `log` for that.
+        """
         rkey = _relkey(relpath)
         data = self._load()
         try:
-            return data[identifier][rkey][uid]
+            return data[identifier][rkey][uid].model_copy(deep=True)
         except KeyError as exc:
             raise KeyError(
                 f"run not found: identifier='{identifier}', relpath='{rkey}', "
@@ -185,16 +389,34 @@ class Ledger(metaclass=PerPathSingleton):
 
         - relpath given -> dict[uid, RunRecord]
         - relpath None  -> dict[relpath, dict[uid, RunRecord]]
+
+        The records are copies, so changing them never reaches the ledger.
         """
         data = self._load()
         if identifier not in data:
             return {}
 
         rkey = _relkey(relpath)
-        return data[identifier].get(rkey, {})
+        return _copy_uid_dict(data[identifier].get(rkey, {}))
 
     def load(self):
-        return self._load()
+        """Copy of the whole ledger (see get_uid_record_dict)."""
+        return {
+            ident: {rkey: _copy_uid_dict(uid_dict) for rkey, uid_dict in rel_dict.items()}
+            for ident, rel_dict in self._load().items()
+        }
+
+    def dump_pretty(self) -> str:
+        """Indented JSON rendering of the ledger, for humans (the file is compact)."""
+        plain = {
+            ident: {
+                rkey: {uid: RECORD_SERIALIZER.to_python(record, mode="json")
+                       for uid, record in uid_dict.items()}
+                for rkey, uid_dict in rel_dict.items()
+            }
+            for ident, rel_dict in self._load().items()
+        }
+        return orjson.dumps(plain, option=orjson.OPT_INDENT_2).decode()
 
     def find_by_param_hash(
         self,
@@ -204,21 +426,31 @@ class Ledger(metaclass=PerPathSingleton):
         relpath: Path = Path(""),
     ) -> tuple[str, RunRecord] | None:
         """
-        Linear scan for a run with matching param_hash.
-        Returns (uid, RunRecord) or None.
+        Look up the first run with matching param_hash.
+        Returns (uid, copy of its RunRecord) or None.
         """
+        rkey = _relkey(relpath)
+        self._load()                 # refreshes the index if the file changed
+        # the cache is always swapped in before the index, so read the index
+        # first: every uid it names is then present in the data
+        uid = self._hash_index.get((identifier, rkey), {}).get(param_hash)
+        if uid is None:
+            return None
+        return uid, self._data[identifier][rkey][uid].model_copy(deep=True)
 
-        # if relpath is None:
-        #     uid_iter = (
-        #         (u, r)
-        #         for uid_dict in self.get_uid_record_dict(identifier).values()
-        #         for u, r in uid_dict.items()
-        #     )
-        # else:
-        #     rkey = _relkey(relpath)
-        uid_iter = self.get_uid_record_dict(identifier, relpath=relpath).items()
-
-        return next(((u, r) for u, r in uid_iter if r.param_hash == param_hash), None)
+    # -----------------------------------------------------------------
+    #  Internals: locking
+    # -----------------------------------------------------------------
+    def _writer_lock(self) -> FileLock:
+        """
+        The cross-process file lock.  A forked child inherits this singleton
+        (and its FileLock, which refuses to be used across fork), so each
+        new process gets a fresh lock on the same file.
+        """
+        if self._lock_pid != os.getpid():
+            self._file_lock = FileLock(str(self._file_lock_path))
+            self._lock_pid = os.getpid()
+        return self._file_lock
 
     # -----------------------------------------------------------------
     #  Internals: context helpers
@@ -230,12 +462,11 @@ class Ledger(metaclass=PerPathSingleton):
         relkey: str,
     ) -> Generator[UID_RECORD_DICT, None, None]:
         """
-        Yield the uid-dict for mutation and persist on exit
-        (wrapped by the global lock).
+        Yield a copy of the uid-dict for mutation and persist on exit
+        (wrapped by the file lock).
         """
         with self._edit_data() as data:
-            rel_dict = data.setdefault(identifier, {})
-            yield rel_dict.setdefault(relkey, {})
+            yield _own_uid_dict(data, identifier, relkey)
 
     @contextmanager
     def _edit_record(
@@ -244,55 +475,180 @@ class Ledger(metaclass=PerPathSingleton):
         relkey: str,
         uid: str,
     ) -> Generator[RunRecord, None, None]:
-        """Yield a mutable RunRecord while guaranteeing persistence."""
-        with self._edit_uid_record_dict(identifier, relkey) as uid_dict:
-            if uid not in uid_dict:
+        """
+        Yield a mutable copy of a RunRecord while guaranteeing persistence.
+
+        Only this record changes, so it is patched into its slot on disk
+        when it still fits; otherwise the whole file is rewritten.
+        """
+        with self._edit_data(patch=(identifier, relkey, uid)) as data:
+            try:
+                record = data[identifier][relkey][uid]
+            except KeyError as exc:
                 raise KeyError(
                     f"run not found: identifier='{identifier}', relpath='{relkey}', "
                     f"uid='{uid}'"
-                )
-            yield uid_dict[uid]
+                ) from exc
+            uid_dict = _own_uid_dict(data, identifier, relkey)
+            uid_dict[uid] = record = record.model_copy(deep=True)
+            yield record
 
     # -----------------------------------------------------------------
-    #  Disk I/O   (all writes go through _edit_data & optional lock)
+    #  Disk I/O   (all writes go through _edit_data & the file lock)
     # -----------------------------------------------------------------
     def _load(self) -> DATA_STRUCTURE:
-        """Return cached data or load from disk if needed (no lock)."""
-        if not self.file.exists():
-            return {}
-
+        """Return cached data, re-reading only if the file changed (no lock)."""
+        gen = _read_gen(self._gen_file)
+        stamp = _stamp(self.file)
+        if (gen is not None and stamp is not None
+                and (gen, *stamp) == self._data_stamp):
+            return self._data
+        return self._read()
+
+    def _read(self) -> DATA_STRUCTURE:
+        """Parse the file from disk and refresh the cache (no lock)."""
+        # read the generation first: a write that lands while we parse
+        # then always bumps it past the one the cache is tagged with
+        gen = _read_gen(self._gen_file)
         try:
-            data = DATA_ADAPTER.validate_json(self.file.read_bytes())
-        except Exception as exc:  # noqa: BLE001
-            raise RuntimeError(f"failed to parse {self.file}: {exc}") from exc
+            with open(self.file, "rb") as fh:
+                stamp = _stamp(fh.fileno())
+                try:
+                    data = _validate(_parse(fh, stamp[1]))
+                except Exception as exc:  # noqa: BLE001
+                    raise RuntimeError(f"failed to parse {self.file}: {exc}") from exc
+        except FileNotFoundError:
+            self._data, self._data_stamp = {}, None
+            self._hash_index = defaultdict(dict)
+            self._counters = {}
+            return self._data
 
         self._data = data
+        self._data_stamp = None if gen is None else (gen, *stamp)
+        self._hash_index = _hash_index(data)
+        self._counters = {}
         return data
 
     @contextmanager
-    def _edit_data(self) -> Generator[DATA_STRUCTURE, None, None]:
+    def _edit_data(
+        self,
+        patch: SLOT_KEY | None = None,
+    ) -> Generator[DATA_STRUCTURE, None, None]:
         """
         Context manager that:
-        1. acquires the global lock (if any),
-        2. loads JSON,
-        3. yields it for mutation,
-        4. writes it back.
+        1. acquires the file lock,
+        2. loads JSON (only if another process changed it),
+        3. yields a draft of it for mutation,
+        4. writes the draft back and only then makes it the cache.
+
+        The draft is copy-on-write: a shallow copy of the top level, in
+        which callers replace whatever they change (see `_own_uid_dict`),
+        so lock-free readers never see an edit before it is on disk, and
+        an edit that fails to write leaves the cache untouched.
+
+        When *patch* names the only record the caller touches, step 4 tries
+        an in-place update before falling back to a full rewrite.
         """
-        lock = LEDGER_LOCK or nullcontext()
-        with lock:
-            data = self._load()
-            yield data
-            self._save(data)
-
-    @contextmanager
-    def _edit_data(self) -> Generator[DATA_STRUCTURE, None, None]:
-        with self._file_lock:
-            data = self._load()
-            yield data
-            self._save(data)
+        with self._writer_lock():
+            data = dict(self._load())      # parses only if another process wrote
+            try:
+                yield data
+                if patch is None or not self._patch(data, patch):
+                    self._save(data)
+            except BaseException:
+                self._data_stamp = None    # the write may have partly landed
+                raise
 
     def _save(self, data: DATA_STRUCTURE) -> None:
-        """Pretty-print JSON to disk and update the in-memory cache."""
-        serialized_data = DATA_ADAPTER.dump_json(data, indent=2)
-        self.file.write_bytes(serialized_data)
+        """
+        Atomically rewrite the whole file and update the in-memory cache.
+
+        The layout is compact JSON, except that every record is padded
+        with trailing spaces up to a `_SLOT_ALIGN` boundary and its
+        (offset, width) is remembered for `_patch`.
+        """
+        buf = bytearray(b"{")
+        slots: dict[SLOT_KEY, SLOT] = {}
+        for i, (ident, rel_dict) in enumerate(data.items()):
+            buf += b"," * bool(i) + _dump_key(ident) + b":{"
+            for j, (rkey, uid_dict) in enumerate(rel_dict.items()):
+                buf += b"," * bool(j) + _dump_key(rkey) + b":{"
+                for k, (uid, record) in enumerate(uid_dict.items()):
+                    buf += b"," * bool(k) + _dump_key(uid) + b":"
+                    slot = _reserve(_dump_record(record))
+                    slots[(ident, rkey, uid)] = (len(buf), len(slot))
+                    buf += slot
+                buf += b"}"
+            buf += b"}"
+        buf += b"}"
+
+        # Stage in a temp file and swap it in atomically: a crash never
+        # leaves a half-written ledger, and readers (or their mmaps) keep
+        # seeing the old inode until the swap.
+        tmp = self.file.with_name(f"{self.file.name}.tmp.{os.getpid()}")
+        try:
+            mode = stat.S_IMODE(os.stat(self.file).st_mode)
+        except FileNotFoundError:
+            mode = None
+        gen = self._begin_write()
+        try:
+            with open(tmp, "wb", buffering=_WRITE_BUFFER) as fh:
+                fh.write(buf)
+                fh.flush()
+                os.fsync(fh.fileno())      # data on disk before the swap
+            if mode is not None:
+                os.chmod(tmp, mode)        # keep the permissions of the file it replaces
+            _replace(tmp, self.file)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        self._slots = slots
+        self._end_write(gen, data)
+
+    def _patch(self, data: DATA_STRUCTURE, key: SLOT_KEY) -> bool:
+        """
+        Overwrite a single record inside its reserved slot.
+
+        The write goes to the live file and is not atomic: unlike `_save`,
+        a crash mid-write can leave this one record torn.
+
+        Returns False (nothing written) when the slot is unknown, the file
+        changed since our last write, or the record outgrew its slot.
+        """
+        # the caller holds the lock and has just checked the cache against
+        # the disk, so the slots are valid iff the cache is our own write
+        slot = self._slots.get(key)
+        if slot is None or self._stamp is None or self._stamp != self._data_stamp:
+            return False
+
+        offset, width = slot
+        ident, rkey, uid = key
+        raw = _dump_record(data[ident][rkey][uid])
+        if len(raw) > width:
+            return False
+
+        gen = self._begin_write()
+        with open(self.file, "r+b") as fh:
+            fh.seek(offset)
+            fh.write(raw.ljust(width))
+        self._end_write(gen, data)
+        return True
+
+    def _begin_write(self) -> int:
+        """
+        Bump the write generation ahead of a write (lock held).
+
+        It is bumped again by `_end_write`, so a reader that parsed the
+        file while the write was in flight sees a new generation after it,
+        and a writer that died mid-write still leaves a changed one behind.
+        Returns the generation to finish with.
+        """
+        gen = (_read_gen(self._gen_file) or 0) + 1
+        _write_gen(self._gen_file, gen)
+        return gen + 1
+
+    def _end_write(self, gen: int, data: DATA_STRUCTURE) -> None:
+        """Publish a finished write: bump the generation, swap in *data*."""
+        _write_gen(self._gen_file, gen)
         self._data = data
+        self._stamp = self._data_stamp = (gen, *_stamp(self.file))
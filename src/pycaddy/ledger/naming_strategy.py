@@ -1,4 +1,4 @@
-from typing import Callable
+from typing import Callable, Container
 from math import log10, ceil
 
 NAMING_STRATEGY = Callable[[list[str]], str]
@@ -7,12 +7,20 @@ NAMING_STRATEGY = Callable[[list[str]], str]
 def uid_formatting(number: int, padding: int):
     return f'{number:0{padding}d}'
 
-def counter_naming_strategy(data: list[str], maxsize: int = 1000) -> str:
-    padding = int(ceil(log10(maxsize)))
-    data = set(data)
-    i = 0
-    name = uid_formatting(i, padding)
-    while name in data:
+
+def uid_padding(maxsize: int) -> int:
+    return int(ceil(log10(maxsize)))
+
+
+def next_free_counter(data: Container[str], start: int = 0, maxsize: int = 1000) -> int:
+    """Smallest counter >= start whose formatted name is not in data."""
+    padding = uid_padding(maxsize)
+    i = start
+    while uid_formatting(i, padding) in data:
         i += 1
-        name = uid_formatting(i, padding)
-    return name
+    return i
+
+
+def counter_naming_strategy(data: list[str], maxsize: int = 1000) -> str:
+    i = next_free_counter(set(data), maxsize=maxsize)
+    return uid_formatting(i, uid_padding(maxsize))
@@ -10,10 +10,12 @@ class PerPathSingleton(type):
     Any subclass **must** accept a `path` or `root` positional/keyword
     argument in its constructor.  The first time you call `Cls(path=...)`
     an instance is created and cached; subsequent calls with the same
-    resolved path return the cached object.
+    resolved path return the cached object.  The constructor receives the
+    resolved path, so it need not normalise it again.
     """
 
     _instances: dict[Path, object] = {}
+    _resolved: dict[Path, Path] = {}     # absolute path -> resolved path
     _lock: RLock = RLock()               # thread-safe
 
     def __call__(cls, *args, **kwargs):
@@ -26,7 +28,16 @@ class PerPathSingleton(type):
         else:
             raise TypeError("Path argument required")
 
-        p = Path(raw)
+        # key on the real file, so "a/../m.json", "~/m.json", etc. share it;
+        # resolving hits the filesystem, so remember it for absolute paths
+        # (relative ones depend on the cwd and are resolved every time)
+        p = Path(raw).expanduser()
+        if not p.is_absolute():
+            p = p.resolve()
+        elif (resolved := cls._resolved.get(p)) is not None:
+            p = resolved
+        else:
+            p = cls._resolved[p] = p.resolve()
 
         with cls._lock:
             if p in cls._instances:
@@ -135,11 +135,8 @@ class Project(BaseModel):
         Return a **new** Project scoped to ``<relpath>/<name>`` and sharing
         the same ledger.
         """
-        child = Project(root=self.root,
-                        relpath=self.relpath / name,
-                        existing_run_strategy=self.existing_run_strategy,
-                        storage_mode=self.storage_mode,
-                        _ledger_file_name=self._ledger_file_name)
+        # model_copy skips re-validation and keeps private attrs (the ledger)
+        child = self.model_copy(update={"relpath": self.relpath / name})
 
         child.ensure_folder()
         return child
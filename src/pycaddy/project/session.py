@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 from ..ledger import Ledger, Status
 from pathlib import Path
 from .structs import StorageMode
@@ -13,6 +14,14 @@ class Session:
     Provides methods to manage run status and attach files to runs.
     Sessions are created by Project.session() and manage their own
     folder structure and file organization.
+
+    Used as a context manager, the session is marked RUNNING on entry and
+    DONE (or ERROR if the block raises) on exit; every status change and
+    attached file in between is buffered and written to the ledger once,
+    on exit.  Nested ``with`` blocks on the same session join the
+    outermost one.  A run that is already DONE on entry (e.g. a resumed
+    one) is left as it is, so ``is_done()`` inside the block still
+    reports it.
     """
     identifier: str
     uid: str
@@ -22,27 +31,44 @@ class Session:
     param_hash: str | None
     storage_mode: StorageMode = StorageMode.SUBFOLDER
 
+    # updates buffered inside a ``with session:`` block (None outside it)
+    _transitions: list[tuple[datetime, Status]] | None = field(default=None, init=False, repr=False)
+    _pending_files: dict[str, Path] = field(default_factory=dict, init=False, repr=False)
+    _depth: int = field(default=0, init=False, repr=False)
+
     @property
     def status(self) -> Status:
+        if self._transitions:
+            return self._transitions[-1][1]
         record = self.ledger.get_record(self.identifier, self.uid, relpath=self.relpath)
         return record.status
 
     def start(self):
-        self.ledger.log(self.identifier, self.uid, relpath=self.relpath, status=Status.RUNNING)
+        self._log(status=Status.RUNNING)
 
     def error(self):
-        self.ledger.log(self.identifier, self.uid, relpath=self.relpath, status=Status.ERROR)
+        self._log(status=Status.ERROR)
 
     def done(self):
-        self.ledger.log(self.identifier, self.uid, relpath=self.relpath, status=Status.DONE)
+        self._log(status=Status.DONE)
 
     def attach_files(self, path_dict: dict[str, Path]):
-        self.ledger.log(self.identifier, self.uid, relpath=self.relpath, path_dict=path_dict)
+        self._log(path_dict=path_dict)
 
     @property
     def files(self) -> dict[str, Path]:
         files_dict = self.ledger.get_record(self.identifier, self.uid, relpath=self.relpath).files
-        return {k: Path(v) for k, v in files_dict.items()}
+        return {k: Path(v) for k, v in (files_dict | self._pending_files).items()}
+
+    def _log(self, status: Status | None = None, path_dict: dict[str, Path] | None = None):
+        if self._transitions is None:
+            self.ledger.log(self.identifier, self.uid, relpath=self.relpath,
+                            status=status, path_dict=path_dict)
+            return
+        if status:
+            self._transitions.append((datetime.now(), status))
+        if path_dict:
+            self._pending_files.update(path_dict)
 
     def is_done(self) -> bool:
         return self.status == Status.DONE
@@ -79,14 +105,31 @@ class Session:
 
         return path
 
-
-    # def __enter__(self):
-    #     return self
-    #
-    # def __exit__(self, exc_type, *_):
-    #     status = Status.ERROR if exc_type else Status.DONE
-    #     self.project.ledger.log(
-    #         self.identifier, self.base,
-    #         status=status,
-    #         add_time_end=True,
-    #     )
+    def __enter__(self):
+        self._depth += 1
+        if self._depth == 1:
+            finished = self.is_done()
+            self._transitions = []
+            self._pending_files = {}
+            if not finished:
+                self.start()
+        return self
+
+    def __exit__(self, exc_type, *_):
+        self._depth -= 1
+        if self._depth:                  # inner block: the outer one flushes
+            return
+
+        # keep a terminal status set inside the block unless it raised;
+        # a run that was DONE on entry (nothing buffered) is not touched
+        if self._transitions:
+            last = self._transitions[-1][1]
+            if exc_type and last is not Status.ERROR:
+                self.error()
+            elif not exc_type and last not in (Status.DONE, Status.ERROR):
+                self.done()
+
+        transitions, files = self._transitions, self._pending_files
+        self._transitions, self._pending_files = None, {}
+        self.ledger.log_bulk(self.identifier, self.uid, relpath=self.relpath,
+                             transitions=transitions, files=files)
@@ -1,4 +1,9 @@
 # tests/test_ledger.py
+import json
+from pathlib import Path
+
+import pytest
+
 from pycaddy.ledger import Status
 
 
@@ -49,14 +54,306 @@ def test_find_by_param_hash(ledger):
     assert hit_uid == uid_foo
     assert hit_record.param_hash == "foo"
 
+
+def test_find_by_param_hash_is_scoped_to_relpath(ledger):
+    """The hash index keeps identifiers and relpaths apart."""
+    uid = ledger.allocate("A", relpath=Path("sub"), param_hash="foo")
+
+    assert ledger.find_by_param_hash("A", "foo") is None
+    assert ledger.find_by_param_hash("B", "foo", relpath=Path("sub")) is None
+    assert ledger.find_by_param_hash("A", "foo", relpath=Path("sub"))[0] == uid
+
 # ----------------------------------------------------------------------
 def test_log_noop_fast_exit(ledger):
     """If log() is called with no status and no files, nothing should change."""
     uid = ledger.allocate("A")
-    before = ledger.get_record("A", uid)
+    before_bytes = ledger.file.read_bytes()
+    before = ledger.get_record("A", uid).model_dump()
 
     ledger.log("A", uid)  # noop
-    after = ledger.get_record("A", uid)
+    after = ledger.get_record("A", uid).model_dump()
+
+    assert before == after                            # deep-equality check
+    assert ledger.file.read_bytes() == before_bytes   # nothing written
+
+
+def test_get_record_returns_a_detached_copy(ledger):
+    """Records handed out never alias the ledger's cache."""
+    uid = ledger.allocate("A")
+    record = ledger.get_record("A", uid)
+
+    record.files["oops"] = Path("oops")
+    ledger.log("A", uid, status=Status.DONE)
+
+    assert record.status is Status.PENDING
+    assert "oops" not in ledger.get_record("A", uid).files
+    assert "oops" not in ledger.file.read_text()
+
+
+def test_empty_updates_never_take_the_lock(ledger, monkeypatch):
+    uid = ledger.allocate("A")
+
+    class _Forbidden:
+        def __enter__(self):
+            raise AssertionError("lock acquired for a no-op")
+
+        def __exit__(self, *_):
+            pass
+
+    monkeypatch.setattr(ledger, "_file_lock", _Forbidden())
+    ledger.log("A", uid, path_dict={})
+    ledger.log_bulk("A", uid, transitions=[], files={})
+
+
+
+# ----------------------------------------------------------------------
+def test_full_rewrite_leaves_no_temp_files(ledger):
+    ledger.allocate("A")
+    ledger.allocate("A")
+    assert sorted(p.name for p in ledger.file.parent.iterdir()
+                  if p.name.startswith(ledger.file.name)) == [ledger.file.name]
+
+
+
+def test_full_rewrite_keeps_file_mode(ledger):
+    import os
+    import stat
+
+    ledger.allocate("A")
+    os.chmod(ledger.file, 0o640)
+    ledger.allocate("A")
+    assert stat.S_IMODE(os.stat(ledger.file).st_mode) == 0o640
+
+
+def test_full_rewrite_retries_while_file_is_held(ledger, monkeypatch):
+    """Windows raises PermissionError while a reader has the file open."""
+    import pycaddy.ledger.ledger as lg
+
+    ledger.allocate("A")
+    replace, calls = lg.os.replace, []
+
+    def busy_replace(*args):
+        calls.append(1)
+        if len(calls) < 3:
+            raise PermissionError("file in use")
+        replace(*args)
+
+    monkeypatch.setattr(lg.os, "replace", busy_replace)
+    monkeypatch.setattr(lg.time, "sleep", lambda _: None)
+    ledger.allocate("A")
+    assert len(calls) == 3
+    assert len(json.loads(ledger.file.read_text())["A"][""]) == 2
+
+def test_log_patches_record_in_place(ledger):
+    """A small log() keeps the file size; an oversized one rewrites it."""
+    uid = ledger.allocate("A")
+    other = ledger.allocate("A")
+    size = ledger.file.stat().st_size
+
+    ledger.log("A", uid, status=Status.RUNNING)
+    assert ledger.file.stat().st_size == size
+
+    ledger.log("A", other, path_dict={f"f{i}": f"/tmp/{i}" for i in range(50)})
+    assert ledger.file.stat().st_size > size
+
+    data = json.loads(ledger.file.read_text())
+    assert data["A"][""][uid]["status"] == Status.RUNNING
+    assert len(data["A"][""][other]["files"]) == 50
+
+
+# ----------------------------------------------------------------------
+def test_reads_are_cached_until_file_changes(ledger, monkeypatch):
+    """Repeated reads reuse the parsed ledger; outside writes are picked up."""
+    uid = ledger.allocate("A")
+    ledger.get_record("A", uid)
+
+    parse = ledger._read
+    reads = []
+    monkeypatch.setattr(ledger, "_read", lambda: reads.append(1) or parse())
+    ledger.get_record("A", uid)
+    assert reads == []
+
+    # simulate another process rewriting the file
+    data = json.loads(ledger.file.read_text())
+    data["A"][""][uid]["status"] = Status.ERROR
+    ledger.file.write_text(json.dumps(data))
+
+    assert ledger.get_record("A", uid).status is Status.ERROR
+
+
+# ----------------------------------------------------------------------
+def test_failed_write_does_not_leave_phantom_records(ledger, monkeypatch):
+    """If flushing fails, the cache must not keep the unwritten edit."""
+    import pycaddy.ledger.ledger as lg
+
+    ledger.allocate("A")
+
+    def broken_replace(*_):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(lg.os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        ledger.allocate("A", param_hash="ghost")
+    monkeypatch.undo()
+
+    assert list(ledger.get_uid_record_dict("A")) == ["000"]
+    assert ledger.find_by_param_hash("A", "ghost") is None
+
+
+def test_edits_are_invisible_until_written(ledger, monkeypatch):
+    """Lock-free readers must not see an edit whose write has not landed."""
+    import pycaddy.ledger.ledger as lg
+
+    ledger.allocate("A")
+    seen = []
+
+    def broken_replace(*args):
+        seen.append(ledger.find_by_param_hash("A", "ghost"))
+        seen.append(list(ledger.get_uid_record_dict("A")))
+        raise OSError("disk full")
+
+    monkeypatch.setattr(lg.os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        ledger.allocate("A", param_hash="ghost")
+
+    assert seen == [None, ["000"]]
+
+
+def test_returned_records_are_detached(ledger):
+    """Changing what get_uid_record_dict/load return never gets saved."""
+    uid = ledger.allocate("A")
+
+    ledger.get_uid_record_dict("A")[uid].status = Status.ERROR
+    ledger.load()["A"][""][uid].files["x"] = Path("x")
+    ledger.allocate("A")
+
+    raw = json.loads(ledger.file.read_text())["A"][""][uid]
+    assert raw["status"] == Status.PENDING and "files" not in raw
+
+
+
+def test_patches_are_seen_despite_coarse_mtime(ledger):
+    """An in-place patch by another process keeps the size; on a coarse
+    clock it can keep the mtime too, and must still not be missed."""
+    import os
+    from pycaddy.ledger import Ledger
+
+    other = Ledger.__new__(Ledger)               # a second process' view
+    other.__init__(ledger.file)
+
+    uid = ledger.allocate("A")
+    other.log("A", uid, status=Status.RUNNING)   # full rewrite by other
+    assert ledger.get_record("A", uid).status is Status.RUNNING
+
+    st = os.stat(ledger.file)
+    other.log("A", uid, status=Status.DONE)      # patched in place
+    os.utime(ledger.file, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert os.stat(ledger.file).st_size == st.st_size
+
+    assert ledger.get_record("A", uid).status is Status.DONE
+    ledger.log("A", uid, path_dict={"out": Path("out.json")})
+    assert json.loads(ledger.file.read_text())["A"][""][uid]["status"] == Status.DONE
+
+
+# ----------------------------------------------------------------------
+def test_dump_pretty_renders_indented_json(ledger):
+    uid = ledger.allocate("A", param_hash="foo")
+
+    pretty = ledger.dump_pretty()
+    assert "\n  " in pretty
+    assert json.loads(pretty)["A"][""][uid]["param_hash"] == "foo"
+
+
+# ----------------------------------------------------------------------
+def test_edits_skip_reparse_of_own_writes(ledger, monkeypatch):
+    """allocate + log in one process re-uses the in-memory ledger."""
+    ledger.allocate("A")
+
+    def fail():
+        raise AssertionError("ledger was re-parsed")
+
+    monkeypatch.setattr(ledger, "_read", fail)
+    for _ in range(5):
+        uid = ledger.allocate("A")
+        ledger.log("A", uid, status=Status.DONE)
+
+    assert len(ledger.get_uid_record_dict("A")) == 6
+
+
+# ----------------------------------------------------------------------
+def test_large_ledgers_parse_via_mmap(ledger, monkeypatch):
+    """Files above the threshold are parsed from an mmap, locked or not."""
+    import pycaddy.ledger.ledger as lg
+
+    monkeypatch.setattr(lg, "_MMAP_THRESHOLD", 1)
+    uid = ledger.allocate("A")
+    ledger._data_stamp = None                    # force a re-read
+    ledger.log("A", uid, status=Status.DONE)
+
+    ledger._data_stamp = None
+    assert ledger.get_record("A", uid).status is Status.DONE
+
+
+# ----------------------------------------------------------------------
+def test_parallel_validation_keeps_layout(ledger, monkeypatch):
+    """The thread-pool path (free-threaded builds) rebuilds the same dict."""
+    import sys
+    import pycaddy.ledger.ledger as lg
+
+    uids = [ledger.allocate("A", param_hash=str(i)) for i in range(5)]
+    ledger.allocate("B", relpath=Path("sub"))
+
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+    monkeypatch.setattr(lg, "_PARALLEL_THRESHOLD", 0)
+    ledger._data_stamp = None                    # force a re-read
+
+    records = ledger.get_uid_record_dict("A")
+    assert list(records) == uids
+    assert [r.param_hash for r in records.values()] == ["0", "1", "2", "3", "4"]
+    assert list(ledger.get_uid_record_dict("B", relpath=Path("sub"))) == ["000"]
+
+
+# ----------------------------------------------------------------------
+def test_default_fields_are_not_written(ledger):
+    uid = ledger.allocate("A")
+
+    raw = json.loads(ledger.file.read_text())["A"][""][uid]
+    assert "param_hash" not in raw and "files" not in raw
+
+    ledger._data_stamp = None                    # force a re-read
+    record = ledger.get_record("A", uid)
+    assert record.param_hash is None and record.files == {}
+
+
+# ----------------------------------------------------------------------
+def test_non_str_identifiers_are_written_as_json_keys(ledger):
+    uid = ledger.allocate(7)
+
+    assert uid in json.loads(ledger.file.read_text())["7"][""]
+
+
+# ----------------------------------------------------------------------
+def test_singleton_keys_on_resolved_path(tmp_path, monkeypatch):
+    from pycaddy.ledger import Ledger
+
+    monkeypatch.chdir(tmp_path)
+    absolute = Ledger(tmp_path / "sub" / "metadata.json")
+
+    assert Ledger("sub/metadata.json") is absolute
+    assert Ledger(tmp_path / "sub" / ".." / "sub" / "metadata.json") is absolute
+    assert absolute.file == tmp_path.resolve() / "sub" / "metadata.json"
+
+
+def test_singleton_resolves_absolute_paths_once(tmp_path, monkeypatch):
+    from pycaddy.ledger import Ledger
 
-    assert before.model_dump() == after.model_dump()  # deep-equality check
+    path = tmp_path / "memo" / "metadata.json"
+    ledger = Ledger(path)
 
+    resolve = Path.resolve
+    calls = []
+    monkeypatch.setattr(Path, "resolve",
+                        lambda self, *a, **kw: calls.append(self) or resolve(self, *a, **kw))
+    assert Ledger(path) is ledger
+    assert Ledger(str(path)) is ledger
+    assert calls == []
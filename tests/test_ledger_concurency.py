@@ -6,19 +6,12 @@ import multiprocessing as mp
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
+import pytest
+
 from pycaddy.ledger import Ledger, Status
 
 
 # ----------------------------------------------------------------------
-def _init_lock(lock):
-    """
-    Pool initializer: make the shared lock visible as pykit.ledger.LEDGER_LOCK
-    in every child process (works for both 'spawn' and 'fork').
-    """
-    import pycaddy.ledger.ledger as lg  # local import to get the module inside the worker
-    lg.LEDGER_LOCK = lock
-
-
 def _worker(meta: str, iterations: int):
     """Allocate + mark DONE 'iterations' times against the same ledger file."""
     led = Ledger(meta)
@@ -37,20 +30,13 @@ def test_concurrent_allocate_log_cross_platform():
     with TemporaryDirectory() as tmpdir:
         meta_file = Path(tmpdir) / "meta.json"
 
-        # Use a process pool so the initializer runs once per worker
-        with mp.Pool(
-            processes=2,
-            # initializer=_init_lock,
-            # initargs=(lock,),
-        ) as pool:
+        # The ledger's file lock needs no pool initializer
+        with mp.Pool(processes=2) as pool:
             # Each worker performs 50 allocate+log operations
             pool.starmap(_worker, [(str(meta_file), 50)] * 2)
             # pool.join()
 
         # ---- main process: verify results ----------------------------------
-        # Clear the lock in this proc; reads don't need it
-        # LEDGER_LOCK = None  # noqa: F401  (silences linters)
-
         ledger = Ledger(meta_file)
         records = ledger.get_uid_record_dict("stress")
 
@@ -60,3 +46,24 @@ def test_concurrent_allocate_log_cross_platform():
 
         # JSON file should still be parseable by plain json.load (corruption check)
         json.loads(meta_file.read_text())
+
+
+# ----------------------------------------------------------------------
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(),
+                    reason="needs the 'fork' start method")
+def test_forked_workers_after_parent_used_the_ledger():
+    """
+    Forked children inherit the parent's Ledger singleton; they must still
+    be able to lock it without any pool initializer.
+    """
+    with TemporaryDirectory() as tmpdir:
+        meta_file = Path(tmpdir) / "meta.json"
+
+        ledger = Ledger(meta_file)
+        ledger.allocate("stress")                 # parent takes the lock first
+
+        with mp.get_context("fork").Pool(processes=2) as pool:
+            pool.starmap(_worker, [(str(meta_file), 20)] * 2)
+
+        records = ledger.get_uid_record_dict("stress")
+        assert len(records) == 41
@@ -90,3 +90,12 @@ def test_resume_returns_existing_uid(project):
     assert resumed.uid == uid_first
     rec_dict = project.ledger.get_uid_record_dict("train")
     assert len(rec_dict) == 1
+
+
+def test_sub_recreates_a_removed_folder(project):
+    import shutil
+
+    child = project.sub("child")
+    shutil.rmtree(child.path)
+
+    assert project.sub("child").path.is_dir()
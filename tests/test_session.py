@@ -105,3 +105,64 @@ def test_resume_session(proj: Project):
     )
     assert s2.uid == first_uid            # reused
     assert len(proj.ledger.get_uid_record_dict("sim")) == 1
+
+
+# ----------------------------------------------------------------------
+# 5. Context manager buffers updates into a single ledger write
+# ----------------------------------------------------------------------
+def test_context_manager_writes_once(proj: Project, tmp_path):
+    run = proj.session("train")
+    before = proj.ledger.file.read_bytes()
+
+    with run:
+        assert run.status is Status.RUNNING
+        run.attach_files({"model": tmp_path / "model.pt"})
+        assert run.files["model"] == tmp_path / "model.pt"
+        assert proj.ledger.file.read_bytes() == before   # nothing flushed yet
+
+    record = proj.ledger.get_record("train", run.uid)
+    assert record.status is Status.DONE
+    assert record.files["model"] == tmp_path / "model.pt"
+    assert [st for _, st in record.timestamp_status_lst] == [
+        Status.PENDING, Status.RUNNING, Status.DONE,
+    ]
+
+
+def test_context_manager_marks_error(proj: Project):
+    run = proj.session("train")
+
+    with pytest.raises(ValueError):
+        with run:
+            raise ValueError
+
+    assert run.status is Status.ERROR
+
+
+def test_nested_context_manager_joins_outer_block(proj: Project, tmp_path):
+    run = proj.session("train")
+
+    with run:
+        with run:
+            run.attach_files({"inner": tmp_path / "inner.txt"})
+        assert run.status is Status.RUNNING
+        run.attach_files({"outer": tmp_path / "outer.txt"})
+
+    record = proj.ledger.get_record("train", run.uid)
+    assert record.status is Status.DONE
+    assert set(record.files) == {"inner", "outer"}
+
+
+def test_context_manager_leaves_finished_runs_alone(proj: Project):
+    """The README auto-resume pattern: `if s.is_done(): continue` in a with."""
+    with proj.session("sim", params={"seed": 7}):
+        pass
+
+    resumed = proj.session(
+        "sim", params={"seed": 7}, existing_run_strategy=ExistingRun.RESUME
+    )
+    history = proj.ledger.get_record("sim", resumed.uid).timestamp_status_lst
+
+    with resumed as s:
+        assert s.is_done()
+
+    assert proj.ledger.get_record("sim", resumed.uid).timestamp_status_lst == history